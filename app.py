@@ -1,6 +1,5 @@
-import eventlet
-eventlet.monkey_patch()
 import os
+import time
 import logging
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
@@ -8,68 +7,81 @@ from flask_login import LoginManager
 from flask_socketio import SocketIO
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
+from assets import Assets
+from config import Config
+from replica import ReadReplica, RoutingSession
+from quiz_cache import QuizContentCache
+from quiz_drafts import QuizDraftStore
+from broadcast import RoomBroadcaster
+from sqlite_writer import SQLiteWriter
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Start of app import, used to report worker cold-start time
+_boot_started = time.perf_counter()
 
 class Base(DeclarativeBase):
     pass
 
 # Initialize extensions
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 socketio = SocketIO(cors_allowed_origins="*")
+assets = Assets()
+writer = SQLiteWriter(db)
+replica = ReadReplica(db)
+quiz_cache = QuizContentCache(db)
+quiz_drafts = QuizDraftStore(db, writer)
+broadcaster = RoomBroadcaster(socketio)
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
+    app.config.from_object(config_class)
     
-    # Configuration
-    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///classroom.db")
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-    }
-    app.config['UPLOAD_FOLDER'] = 'uploads'
-    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
     
     # Proxy fix for HTTPS
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     
     # Initialize extensions
     db.init_app(app)
+    writer.init_app(app)
+    replica.init_app(app)
     login_manager.init_app(app)
     socketio.init_app(app)
+    assets.init_app(app)
+    quiz_cache.init_app(app)
+    quiz_drafts.init_app(app)
+    broadcaster.init_app(app)
     
     # Login manager configuration
-    login_manager.login_view = 'login'
+    login_manager.login_view = 'main.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
     
     # Create upload directory
     os.makedirs(os.path.join(app.instance_path, 'uploads'), exist_ok=True)
     
+    # Schema and seed data are managed explicitly: `flask --app app init-db`
+    from commands import init_db_command
+    app.cli.add_command(init_db_command)
+    
+    # Models, views and socket handlers import the extensions above
+    import models
+    import socket_events
+    from routes import bp
+    app.register_blueprint(bp)
+    
+    _register_boot_timing(app)
+    
     return app
 
-app = create_app()
-
-# Import models to ensure they're registered
-with app.app_context():
-    import models
-    db.create_all()
+def _register_boot_timing(app):
+    boot_ms = (time.perf_counter() - _boot_started) * 1000
+    app.logger.info('Worker %d booted in %.1f ms', os.getpid(), boot_ms)
+    first_request = {'pending': True}
     
-    # Initialize staff IDs if not exists
-    from models import StaffID
-    if not StaffID.query.first():
-        staff_ids = [
-            "ST001", "ST002", "ST003", "ST004", "ST005",
-            "ST006", "ST007", "ST008", "ST009", "ST010",
-            "ST011", "ST012", "ST013", "ST014", "ST015"
-        ]
-        for staff_id in staff_ids:
-            new_staff_id = StaffID()
-            new_staff_id.staff_id = staff_id
-            db.session.add(new_staff_id)
-        db.session.commit()
-        logging.info("Staff IDs initialized")
+    @app.before_request
+    def log_first_request():
+        if first_request['pending']:
+            first_request['pending'] = False
+            elapsed_ms = (time.perf_counter() - _boot_started) * 1000
+            app.logger.info('Worker %d served first request %.1f ms after start', os.getpid(), elapsed_ms)
@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import time
+
+import click
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it builds still write gzip
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Superseded builds stay this long for open pages and workers that have
+# not reloaded the manifest yet
+KEEP_OLD_BUILDS_SECONDS = 7 * 24 * 3600
+
+# Encodings we precompress, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def hashed_name(path, content):
+    """Insert a short content hash before the extension: js/main.js -> js/main.1a2b3c4d5e6f.js"""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = os.path.splitext(path)
+    return f'{root}.{digest}{ext}'
+
+
+def build_assets(static_folder, source_dirs=('css', 'js'), keep_seconds=KEEP_OLD_BUILDS_SECONDS):
+    """Fingerprint and precompress static assets into static/dist and write the manifest.
+
+    Files from earlier builds are kept until keep_seconds after the last
+    build that still referenced them, so a deploy never 404s hashed URLs
+    that running workers or open pages still use.
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    built = set()
+
+    manifest = {}
+    for source_dir in source_dirs:
+        for root, _, files in os.walk(os.path.join(static_folder, source_dir)):
+            for filename in sorted(files):
+                source_path = os.path.join(root, filename)
+                logical = os.path.relpath(source_path, static_folder).replace(os.sep, '/')
+                with open(source_path, 'rb') as f:
+                    content = f.read()
+
+                target = hashed_name(logical, content)
+                target_path = os.path.join(dist_folder, target)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                with open(target_path, 'wb') as f:
+                    f.write(content)
+                with open(target_path + '.gz', 'wb') as f:
+                    f.write(gzip.compress(content, compresslevel=9, mtime=0))
+                built.update((target_path, target_path + '.gz'))
+                if brotli is not None:
+                    with open(target_path + '.br', 'wb') as f:
+                        f.write(brotli.compress(content, quality=11))
+                    built.add(target_path + '.br')
+
+                manifest[logical] = f'{DIST_DIR}/{target}'
+
+    manifest_path = os.path.join(dist_folder, MANIFEST_NAME)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    built.add(manifest_path)
+
+    prune_old_builds(dist_folder, built, keep_seconds)
+    return manifest
+
+
+def prune_old_builds(dist_folder, current, keep_seconds):
+    """Delete files no build has written for keep_seconds; rewritten files have a fresh mtime"""
+    cutoff = time.time() - keep_seconds
+    for root, _, files in os.walk(dist_folder):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if path not in current and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+
+class Assets:
+    """Resolves fingerprinted asset names and serves them precompressed with immutable caching"""
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.hashed_files = frozenset()
+        self.version = 'dev'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['assets'] = self
+        self.load_manifest(app)
+
+        # url_for('static', filename='js/main.js') resolves to the hashed name
+        app.url_defaults(self.rewrite_static_url)
+        app.view_functions['static'] = self.send_static
+
+        @app.cli.group('assets')
+        def assets_cli():
+            """Static asset pipeline"""
+
+        @assets_cli.command('build')
+        def build_command():
+            """Fingerprint and precompress static files"""
+            manifest = build_assets(app.static_folder)
+            self.load_manifest(app)
+            click.echo(f'Built {len(manifest)} assets (version {self.version})')
+
+    def load_manifest(self, app):
+        manifest_path = os.path.join(app.static_folder, DIST_DIR, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            logging.info('No asset manifest found, serving unhashed static files')
+            self.manifest = {}
+            self.hashed_files = frozenset()
+            self.version = 'dev'
+            return
+        self.manifest = json.loads(raw)
+        self.hashed_files = frozenset(self.manifest.values())
+        self.version = hashlib.sha256(raw).hexdigest()[:12]
+
+    def rewrite_static_url(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]
+
+    def send_static(self, filename):
+        if not filename.startswith(DIST_DIR + '/') or filename not in self.hashed_files:
+            return current_app.send_static_file(filename)
+
+        static_folder = current_app.static_folder
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        accepted = request.accept_encodings
+
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if accepted[encoding] and os.path.isfile(os.path.join(static_folder, filename + suffix)):
+                response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                del response.headers['Content-Disposition']
+                break
+        if response is None:
+            response = send_from_directory(static_folder, filename, mimetype=mimetype)
+
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def precache_urls(self):
+        """Hashed URLs the service worker should keep cached"""
+        return [f'{current_app.static_url_path}/{path}' for path in sorted(self.manifest.values())]
@@ -0,0 +1,99 @@
+"""Benchmark chat broadcast frames and bytes for a busy classroom room.
+
+Senders post chat lines through the real send_message handler at a fixed
+rate, once with one frame per line (BROADCAST_COALESCE=0) and once with
+coalesced compact frames (BROADCAST_COALESCE=1), each in a fresh
+interpreter. Every room-level emit is counted as one Engine.IO message
+per room member, using the same packet encoding Socket.IO sends.
+
+    python benchmarks/broadcast.py --members 60 --rate 200 --seconds 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def run_mode(members, senders, rate, seconds):
+    from main import app  # monkey patches, like the real server
+    from socketio.packet import Packet, EVENT
+    from app import db, socketio, broadcaster
+    from commands import init_db
+    from models import User, ClassSession
+
+    with app.app_context():
+        init_db()
+        for i in range(senders):
+            user = User(username=f'student{i:02d}', email=f'student{i}@example.com', role='student', class_name='SS1A')
+            user.set_password('bench')
+            db.session.add(user)
+        db.session.flush()
+        db.session.add(ClassSession(teacher_id=1, class_name='SS1A', subject='Mathematics'))
+        db.session.commit()
+
+    clients = []
+    for i in range(senders):
+        http = app.test_client()
+        http.post('/login', data={'username': f'student{i:02d}', 'password': 'bench'})
+        client = socketio.test_client(app, flask_test_client=http)
+        client.emit('join_classroom', {'session_id': 1})
+        clients.append(client)
+
+    counts = {'frames': 0, 'bytes': 0}
+    server_emit = socketio.server.emit
+
+    def counting_emit(event, data=None, *args, **kwargs):
+        if event in ('message', 'messages'):
+            packet = Packet(EVENT, data=[event, data]).encode()
+            counts['frames'] += members
+            counts['bytes'] += members * (len(packet.encode()) + 1)  # +1 for the Engine.IO message type
+        return server_emit(event, data, *args, **kwargs)
+
+    socketio.server.emit = counting_emit
+
+    total = int(rate * seconds)
+    started = time.perf_counter()
+    for i in range(total):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        clients[i % senders].emit('send_message', {'session_id': 1, 'message': f'Question {i} about fractions, page {i % 40}'})
+    time.sleep(broadcaster.window * 2 + 0.1)
+    elapsed = time.perf_counter() - started
+
+    return {'lines': total, 'frames_per_sec': counts['frames'] / elapsed, 'bytes_per_sec': counts['bytes'] / elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=60, help='students receiving each broadcast')
+    parser.add_argument('--senders', type=int, default=10)
+    parser.add_argument('--rate', type=float, default=100, help='chat lines per second across the room')
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.members, args.senders, args.rate, args.seconds)))
+        return
+
+    for label, coalesce in (('before', '0'), ('after', '1')):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                       BROADCAST_COALESCE=coalesce,
+                       LOG_LEVEL='WARNING')
+            output = subprocess.run([sys.executable, __file__, '--child',
+                                     '--members', str(args.members), '--senders', str(args.senders),
+                                     '--rate', str(args.rate), '--seconds', str(args.seconds)],
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:<7} {result['lines']:6d} lines   {result['frames_per_sec']:10.1f} frames/s   "
+              f"{result['bytes_per_sec'] / 1024:10.1f} KiB/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Measure worker cold-start time and time-to-first-request.
+
+Each run boots the app in a fresh interpreter, the way a gunicorn or
+eventlet worker would, and reports how long importing the app took and
+how long until the first request was answered.
+
+    python benchmarks/cold_start.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import json, time
+started = time.perf_counter()
+import main
+booted = time.perf_counter()
+client = main.app.test_client()
+response = client.get('/login')
+first_request = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({'boot_ms': (booted - started) * 1000,
+                  'first_request_ms': (first_request - started) * 1000}))
+"""
+
+def run_worker(env):
+    output = subprocess.run([sys.executable, '-c', WORKER], cwd=ROOT, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(label, values):
+    print(f"{label:<20} median {statistics.median(values):8.1f} ms   "
+          f"min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                   LOG_LEVEL='WARNING')
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'init-db'],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+
+        results = [run_worker(env) for _ in range(args.runs)]
+
+    summarize('cold start', [r['boot_ms'] for r in results])
+    summarize('first request', [r['first_request_ms'] for r in results])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark mixed chat and quiz write load against SQLite.
+
+Runs the same workload twice, each in a fresh interpreter: once with plain
+per-request commits (SQLITE_OPTIMIZED=0) and once through the WAL-mode
+single writer (SQLITE_OPTIMIZED=1). Each producer behaves like a request
+handler: it queries on the shared session and then writes. Both modes use
+the same lock timeout, so the throughput and the number of "database is
+locked" errors the producers saw are comparable.
+
+    python benchmarks/sqlite_writes.py --producers 32 --writes 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def run_mode(producers, writes, busy_timeout_ms):
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import OperationalError
+    from config import Config
+
+    # The optimized mode also sets PRAGMA busy_timeout to this value; the
+    # driver timeout gives the plain mode the same lock wait
+    Config.SQLALCHEMY_ENGINE_OPTIONS = dict(Config.SQLALCHEMY_ENGINE_OPTIONS,
+                                            connect_args={'timeout': busy_timeout_ms / 1000})
+
+    from app import create_app, db, writer
+    app = create_app()
+    from commands import init_db
+    from models import User, ClassSession, Quiz, Message, QuizAttempt
+
+    with app.app_context():
+        init_db()
+        user = User(username='bench', email='bench@example.com', role='student', class_name='SS1A')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.flush()
+        quiz = Quiz(title='Bench', subject='Mathematics', class_name='SS1A', teacher_id=user.id)
+        db.session.add_all([quiz, ClassSession(teacher_id=user.id, class_name='SS1A', subject='Mathematics')])
+        db.session.commit()
+        user_id, quiz_id = user.id, quiz.id
+
+    lock_errors = 0
+    counter_lock = threading.Lock()
+
+    def make_write(i):
+        if i % 4 == 0:
+            obj = QuizAttempt(quiz_id=quiz_id, student_id=user_id, answers={'1': 'A'}, score=1, total_points=1)
+        else:
+            obj = Message(sender_id=user_id, class_name='SS1A', subject='Mathematics', content=f'message {i}')
+        return lambda write_session: write_session.add(obj)
+
+    def handle(i):
+        # Like the chat and quiz handlers: look up on the request session, then write
+        db.session.get(User, user_id)
+        db.session.scalar(select(func.count(Message.id)).where(Message.class_name == 'SS1A'))
+        writer.write(make_write(i))
+        db.session.remove()
+
+    def producer():
+        nonlocal lock_errors
+        with app.app_context():
+            for i in range(writes):
+                while True:
+                    try:
+                        handle(i)
+                        break
+                    except OperationalError as exc:
+                        db.session.rollback()
+                        if 'locked' not in str(exc):
+                            raise
+                        with counter_lock:
+                            lock_errors += 1
+
+    threads = [threading.Thread(target=producer) for _ in range(producers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = producers * writes
+    return {'writes': total, 'seconds': elapsed, 'writes_per_sec': total / elapsed, 'lock_errors': lock_errors}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--producers', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=100, help='writes per producer')
+    parser.add_argument('--busy-timeout-ms', type=int, default=100,
+                        help='lock wait before SQLite reports "database is locked"')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.producers, args.writes, args.busy_timeout_ms)))
+        return
+
+    for label, optimized in (('before', '0'), ('after', '1')):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                       SQLITE_OPTIMIZED=optimized,
+                       SQLITE_BUSY_TIMEOUT_MS=str(args.busy_timeout_ms),
+                       LOG_LEVEL='WARNING')
+            output = subprocess.run([sys.executable, __file__, '--child',
+                                     '--producers', str(args.producers), '--writes', str(args.writes),
+                                     '--busy-timeout-ms', str(args.busy_timeout_ms)],
+                                    env=env, check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:<7} {result['writes']:6d} writes in {result['seconds']:6.2f}s   "
+              f"{result['writes_per_sec']:8.1f} writes/s   {result['lock_errors']:5d} lock errors")
+
+if __name__ == '__main__':
+    main()
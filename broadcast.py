@@ -0,0 +1,70 @@
+import threading
+from calendar import timegm
+
+
+def epoch(timestamp):
+    """UTC datetime to epoch seconds, cheaper on the wire than a formatted string"""
+    return timegm(timestamp.utctimetuple())
+
+
+class RoomBroadcaster:
+    """Coalesces chat lines per room into one compact frame per window.
+
+    A 'messages' frame looks like
+        {'r': {user_id: [username, role]}, 'm': [[user_id, text, epoch], ...]}
+    where 'r' only carries roster entries the room has not been sent yet.
+    Clients get the full roster when they join and can look up unknown ids
+    with the 'roster_lookup' event (e.g. lines relayed from another worker).
+    A room's roster is dropped when the room empties, so it only covers
+    people who posted while someone was in the room.
+    """
+
+    def __init__(self, socketio, app=None):
+        self.socketio = socketio
+        self.enabled = False
+        self._buffers = {}
+        self._rosters = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['broadcaster'] = self
+        self.enabled = app.config['BROADCAST_COALESCE']
+        self.window = app.config['BROADCAST_WINDOW_MS'] / 1000
+
+    def roster(self, room):
+        """Every entry already sent to the room, for clients that join later"""
+        with self._lock:
+            return dict(self._rosters.get(room, {}))
+
+    def forget_if_empty(self, room, leaving_sid=None):
+        """Drop a room's roster once its last member on this worker has left"""
+        participants = self.socketio.server.manager.get_participants('/', room)
+        if all(sid == leaving_sid for sid, _ in participants):
+            with self._lock:
+                self._rosters.pop(room, None)
+
+    def send_message(self, room, user, text, timestamp):
+        """Queue a chat line; the first line in a window schedules the flush"""
+        with self._lock:
+            roster = self._rosters.setdefault(room, {})
+            buffer = self._buffers.get(room)
+            start_flush = buffer is None
+            if start_flush:
+                buffer = self._buffers[room] = {'r': {}, 'm': []}
+            if user.id not in roster:
+                roster[user.id] = [user.username, user.role]
+                buffer['r'][user.id] = roster[user.id]
+            buffer['m'].append([user.id, text, epoch(timestamp)])
+        if start_flush:
+            self.socketio.start_background_task(self._flush_later, room)
+
+    def _flush_later(self, room):
+        self.socketio.sleep(self.window)
+        with self._lock:
+            frame = self._buffers.pop(room, None)
+        if frame:
+            if not frame['r']:
+                del frame['r']
+            self.socketio.emit('messages', frame, to=room)
@@ -0,0 +1,36 @@
+import logging
+import click
+from flask.cli import with_appcontext
+from app import db
+
+STAFF_IDS = [
+    "ST001", "ST002", "ST003", "ST004", "ST005",
+    "ST006", "ST007", "ST008", "ST009", "ST010",
+    "ST011", "ST012", "ST013", "ST014", "ST015"
+]
+
+def init_db():
+    """Create missing tables and search indexes, and seed the staff IDs teachers register with"""
+    from models import StaffID
+    from search import create_search_index
+    db.create_all()
+    # create_all() skips indexes added to tables that already exist
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    create_search_index(db)
+    
+    if not StaffID.query.first():
+        for staff_id in STAFF_IDS:
+            new_staff_id = StaffID()
+            new_staff_id.staff_id = staff_id
+            db.session.add(new_staff_id)
+        db.session.commit()
+        logging.info("Staff IDs initialized")
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create database tables and seed initial data"""
+    init_db()
+    click.echo('Database initialized')
@@ -1,8 +1,38 @@
 import os
 
 class Config:
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    SECRET_KEY = os.environ.get('SESSION_SECRET') or os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///classroom.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_recycle': 300,
+        'pool_pre_ping': True,
+    }
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    DEBUG = os.environ.get('FLASK_DEBUG') == '1'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL') or ('DEBUG' if DEBUG else 'INFO')
+    
+    # Optional read replica for dashboard, listing and analytics views
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_MAX_STALENESS_SECONDS = float(os.environ.get('REPLICA_MAX_STALENESS_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = 1
+    
+    # In-memory quiz payloads; the TTL bounds staleness across workers
+    QUIZ_CACHE_TTL_SECONDS = int(os.environ.get('QUIZ_CACHE_TTL_SECONDS', 30))
+    QUIZ_SHUFFLE_QUESTIONS = os.environ.get('QUIZ_SHUFFLE_QUESTIONS') == '1'
+    
+    # Server-side drafts of in-progress quiz attempts
+    QUIZ_DRAFT_IDLE_SECONDS = 3600
+    
+    # Batch chat lines per room into compact frames
+    BROADCAST_COALESCE = os.environ.get('BROADCAST_COALESCE') == '1'
+    BROADCAST_WINDOW_MS = int(os.environ.get('BROADCAST_WINDOW_MS', 100))
+
+    # SQLite-optimized mode: WAL, busy timeout and a single group-committing writer
+    SQLITE_OPTIMIZED = os.environ.get('SQLITE_OPTIMIZED', '1') == '1'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_WRITER_BATCH_SIZE = 64
+    SQLITE_WRITER_BATCH_WINDOW_MS = 5
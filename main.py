@@ -1,6 +1,13 @@
-from app import app, socketio
-import routes
-import socket_events
+import eventlet
+eventlet.monkey_patch()
+from app import create_app, socketio
+
+app = create_app()
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5000, debug=True, use_reloader=True, log_output=True)
+    # Development server; production workers are started by gunicorn and
+    # expect the schema to exist already (`flask --app app init-db`)
+    from commands import init_db
+    with app.app_context():
+        init_db()
+    socketio.run(app, host="0.0.0.0", port=5000, debug=app.debug, use_reloader=app.debug, log_output=app.debug)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from app import db, login_manager
+from app import db, login_manager, quiz_cache, quiz_drafts
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -70,6 +70,12 @@ class Assignment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     submissions = db.relationship('Submission', backref='assignment', lazy=True, cascade='all, delete-orphan')
+    
+    # Back the paginated listings: filter by class or teacher, then subject, sorted by due date
+    __table_args__ = (
+        db.Index('ix_assignment_class_subject_due', 'class_name', 'subject', 'due_date'),
+        db.Index('ix_assignment_teacher_subject_due', 'teacher_id', 'subject', 'due_date'),
+    )
 
 class Submission(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -81,6 +87,10 @@ class Submission(db.Model):
     feedback = db.Column(db.Text)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     graded_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_submission_assignment_student', 'assignment_id', 'student_id'),
+    )
 
 class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -118,6 +128,13 @@ class QuizAttempt(db.Model):
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
 
+class QuizDraft(db.Model):
+    # In-progress answers, saved with every autosave delta until the attempt is submitted
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    answers = db.Column(db.JSON)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -126,6 +143,11 @@ class Message(db.Model):
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+class ReplicaHeartbeat(db.Model):
+    # Single row written on the primary; its age on the replica is the replication lag
+    id = db.Column(db.Integer, primary_key=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -135,3 +157,6 @@ class Notification(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref='notifications')
+
+quiz_cache.register_models(Quiz, QuizQuestion)
+quiz_drafts.register_models(QuizDraft, QuizAttempt)
@@ -0,0 +1,105 @@
+from datetime import datetime
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import selectinload
+from app import db
+from models import Assignment, Submission
+
+RECENT_SUBMISSIONS = 5
+STATUSES = ('pending', 'submitted', 'graded', 'overdue')
+
+def assignment_page(user, page=1, per_page=10, subject=None, due_after=None, due_before=None,
+                    class_name=None, status=None, now=None):
+    """One page of assignments for a teacher or student, with submission status.
+
+    Runs a fixed number of queries however many assignments are on the
+    page: the page itself, then aggregates (teacher) or the student's own
+    submissions, instead of touching each assignment's submissions.
+    class_name filters a teacher's assignments and status a student's, so
+    both cover every page rather than the one being shown.
+    """
+    query = select(Assignment)
+    if user.role == 'teacher':
+        query = query.where(Assignment.teacher_id == user.id)
+        if class_name:
+            query = query.where(Assignment.class_name == class_name)
+    else:
+        query = query.where(Assignment.class_name == user.class_name)
+        if status:
+            query = query.where(status_condition(user.id, status, now or datetime.utcnow()))
+    if subject:
+        query = query.where(Assignment.subject == subject)
+    if due_after:
+        query = query.where(Assignment.due_date >= due_after)
+    if due_before:
+        query = query.where(Assignment.due_date <= due_before)
+    query = query.order_by(Assignment.due_date.desc(), Assignment.id.desc())
+
+    pagination = db.paginate(query, page=page, per_page=per_page, error_out=False)
+    assignment_ids = [assignment.id for assignment in pagination.items]
+
+    if user.role == 'teacher':
+        status = teacher_submission_stats(assignment_ids)
+    else:
+        status = student_submissions(user.id, assignment_ids)
+    return pagination, status
+
+def status_condition(student_id, status, now):
+    """SQL equivalent of submission_status for one student"""
+    submission = (select(Submission.id)
+                  .where(Submission.assignment_id == Assignment.id, Submission.student_id == student_id))
+    if status == 'graded':
+        return submission.where(Submission.grade.is_not(None)).exists()
+    if status == 'submitted':
+        return submission.where(Submission.grade.is_(None)).exists()
+    overdue = and_(Assignment.due_date.is_not(None), Assignment.due_date < now)
+    return and_(~submission.exists(), overdue if status == 'overdue' else ~overdue)
+
+def teacher_submission_stats(assignment_ids):
+    """Submission/grade counts and the most recent submissions per assignment"""
+    stats = {assignment_id: {'submissions': 0, 'graded': 0, 'recent': []} for assignment_id in assignment_ids}
+    if not assignment_ids:
+        return stats
+
+    counts = db.session.execute(
+        select(Submission.assignment_id,
+               func.count(Submission.id),
+               func.count(Submission.grade))
+        .where(Submission.assignment_id.in_(assignment_ids))
+        .group_by(Submission.assignment_id)
+    )
+    for assignment_id, submissions, graded in counts:
+        stats[assignment_id]['submissions'] = submissions
+        stats[assignment_id]['graded'] = graded
+
+    ranked = (
+        select(Submission.id,
+               func.row_number().over(partition_by=Submission.assignment_id,
+                                      order_by=Submission.submitted_at.desc()).label('position'))
+        .where(Submission.assignment_id.in_(assignment_ids))
+        .subquery()
+    )
+    recent = db.session.scalars(
+        select(Submission)
+        .join(ranked, ranked.c.id == Submission.id)
+        .where(ranked.c.position <= RECENT_SUBMISSIONS)
+        .order_by(Submission.assignment_id, ranked.c.position)
+        .options(selectinload(Submission.student))
+    )
+    for submission in recent:
+        stats[submission.assignment_id]['recent'].append(submission)
+    return stats
+
+def student_submissions(student_id, assignment_ids):
+    """The student's own submission for each assignment on the page, if any"""
+    if not assignment_ids:
+        return {}
+    submissions = db.session.scalars(
+        select(Submission)
+        .where(Submission.student_id == student_id, Submission.assignment_id.in_(assignment_ids))
+    )
+    return {submission.assignment_id: submission for submission in submissions}
+
+def submission_status(submission, assignment, now):
+    if submission is None:
+        return 'overdue' if assignment.due_date and assignment.due_date < now else 'pending'
+    return 'graded' if submission.grade is not None else 'submitted'
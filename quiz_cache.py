@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+OPTION_LETTERS = ('A', 'B', 'C', 'D')
+
+# session.info key for quizzes changed in the current transaction
+CHANGED_KEY = 'quiz_cache_changed'
+
+
+class CachedQuiz:
+    """Student-facing quiz payload, serialized once and kept in memory"""
+
+    def __init__(self, quiz, questions):
+        header = {
+            'id': quiz.id,
+            'title': quiz.title,
+            'description': quiz.description,
+            'subject': quiz.subject,
+            'time_limit': quiz.time_limit,
+        }
+        # Each question is serialized on its own so a shuffled order can be
+        # assembled by joining fragments instead of re-encoding
+        self.fragments = [self.dumps({
+            'id': question.id,
+            'text': question.question_text,
+            'options': {letter: getattr(question, f'option_{letter.lower()}') for letter in OPTION_LETTERS},
+            'points': question.points,
+        }) for question in questions]
+        self.question_ids = frozenset(str(question.id) for question in questions)
+        self.prefix = self.dumps(header)[:-1] + b',"questions":['
+        self.body = self.assemble(range(len(self.fragments)))
+        self.gzipped = gzip.compress(self.body, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:16]
+        self.built_at = time.monotonic()
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, separators=(',', ':')).encode()
+
+    def assemble(self, order):
+        return self.prefix + b','.join(self.fragments[i] for i in order) + b']}'
+
+    def shuffled(self, student_id):
+        """Question order that is stable for one student and differs between students"""
+        order = list(range(len(self.fragments)))
+        random.Random(f'{self.etag}:{student_id}').shuffle(order)
+        return self.assemble(order), f'{self.etag}-{student_id}'
+
+
+class QuizContentCache:
+    """Per-process cache of quiz payloads without the answer key.
+
+    Entries are dropped once a change to a quiz or its questions commits in
+    this process (mapper events record the quiz on flush, so every write
+    path is covered) and expire after QUIZ_CACHE_TTL_SECONDS, which bounds
+    staleness when another worker made the change.
+    """
+
+    def __init__(self, db, app=None):
+        self.db = db
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['quiz_cache'] = self
+        self.ttl = app.config['QUIZ_CACHE_TTL_SECONDS']
+        self.shuffle = app.config['QUIZ_SHUFFLE_QUESTIONS']
+
+    def register_models(self, quiz_model, question_model):
+        """Invalidate after any insert, update or delete of a quiz or its questions commits"""
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(quiz_model, name, lambda mapper, connection, target: self._changed(target, target.id))
+            event.listen(question_model, name, lambda mapper, connection, target: self._changed(target, target.quiz_id))
+        # Invalidating at flush time would let a request rebuild the entry
+        # from the old committed rows before the writer's batch commits
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', lambda session: session.info.pop(CHANGED_KEY, None))
+        self.quiz_model = quiz_model
+        self.question_model = question_model
+
+    def _changed(self, target, quiz_id):
+        object_session(target).info.setdefault(CHANGED_KEY, set()).add(quiz_id)
+
+    def _after_commit(self, session):
+        for quiz_id in session.info.pop(CHANGED_KEY, ()):
+            self.invalidate(quiz_id)
+
+    def get(self, quiz):
+        entry = self._entries.get(quiz.id)
+        if entry is not None and time.monotonic() - entry.built_at < self.ttl:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(quiz.id)
+            if entry is None or time.monotonic() - entry.built_at >= self.ttl:
+                generation = self._generations.get(quiz.id, 0)
+                questions = self.db.session.scalars(
+                    select(self.question_model)
+                    .where(self.question_model.quiz_id == quiz.id)
+                    .order_by(self.question_model.id)
+                ).all()
+                entry = CachedQuiz(quiz, questions)
+                # A commit that landed while we were reading may not be in
+                # what we read; serve it this once but don't keep it
+                if self._generations.get(quiz.id, 0) == generation:
+                    self._entries[quiz.id] = entry
+        return entry
+
+    def invalidate(self, quiz_id):
+        self._generations[quiz_id] = self._generations.get(quiz_id, 0) + 1
+        self._entries.pop(quiz_id, None)
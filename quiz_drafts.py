@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete
+
+VALID_ANSWERS = ('A', 'B', 'C', 'D')
+
+
+def valid_answers(answers, question_ids):
+    """Keep only {question_id: 'A'-'D'} entries for questions in the quiz"""
+    return {str(question_id): answer for question_id, answer in answers.items()
+            if str(question_id) in question_ids and answer in VALID_ANSWERS}
+
+
+class Draft:
+    def __init__(self, answers, question_ids):
+        self.answers = dict(answers)
+        self.question_ids = question_ids
+        self.touched = time.monotonic()
+
+
+class QuizDraftStore:
+    """In-progress quiz answers, updated by small deltas.
+
+    Each delta is merged into the worker's copy and written through the
+    SQLite writer before it is acknowledged, so the writer's group commit
+    batches concurrent students and an acknowledged answer survives a
+    worker restart. The in-memory copy saves a read per delta and at
+    submit time; the submit request only carries unacknowledged answers.
+    """
+
+    def __init__(self, db, writer, app=None):
+        self.db = db
+        self.writer = writer
+        self.model = None
+        self.attempt_model = None
+        self._drafts = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['quiz_drafts'] = self
+        self.idle_timeout = app.config['QUIZ_DRAFT_IDLE_SECONDS']
+
+    def register_models(self, model, attempt_model):
+        """The draft table, and the attempt table that marks a quiz as submitted"""
+        self.model = model
+        self.attempt_model = attempt_model
+
+    def is_open(self, quiz_id, student_id):
+        return (quiz_id, student_id) in self._drafts
+
+    def open(self, quiz_id, student_id, question_ids):
+        """Start tracking an attempt, loading any saved draft; access is checked by the caller"""
+        key = (quiz_id, student_id)
+        if key not in self._drafts:
+            self._forget_idle()
+            answers = self._fetch(quiz_id, student_id)
+            with self._lock:
+                self._drafts.setdefault(key, Draft(answers, question_ids))
+
+    def answers(self, quiz_id, student_id):
+        draft = self._drafts.get((quiz_id, student_id))
+        return dict(draft.answers) if draft else {}
+
+    def update(self, quiz_id, student_id, deltas):
+        """Apply {question_id: answer} deltas to an open draft and save it before returning"""
+        key = (quiz_id, student_id)
+        draft = self._drafts.get(key)
+        if draft is None:
+            return 0
+        valid = valid_answers(deltas, draft.question_ids)
+        with self._lock:
+            draft.answers.update(valid)
+            draft.touched = time.monotonic()
+        self.writer.write(lambda write_session: self._save(write_session, key))
+        return len(valid)
+
+    def finalize(self, quiz_id, student_id):
+        """Remove the draft from memory and return its answers for grading.
+
+        The caller deletes the persisted row (see delete_persisted) in the
+        same write as the quiz attempt.
+        """
+        key = (quiz_id, student_id)
+        with self._lock:
+            draft = self._drafts.pop(key, None)
+        if draft is not None:
+            return dict(draft.answers)
+        return self._fetch(quiz_id, student_id)
+
+    def discard(self, quiz_id, student_id):
+        """Forget a draft without returning it, e.g. one reopened by a late delta"""
+        with self._lock:
+            self._drafts.pop((quiz_id, student_id), None)
+
+    def delete_persisted(self, write_session, quiz_id, student_id):
+        write_session.execute(delete(self.model).where(self.model.quiz_id == quiz_id,
+                                                       self.model.student_id == student_id))
+
+    def _fetch(self, quiz_id, student_id):
+        saved = self.db.session.get(self.model, (quiz_id, student_id))
+        return dict(saved.answers or {}) if saved else {}
+
+    def _save(self, write_session, key):
+        # Writes run in order, so saving the copy as it is now (not as it was
+        # when the delta arrived) leaves the newest answers in the row
+        quiz_id, student_id = key
+        submitted = write_session.query(self.attempt_model).filter_by(
+            quiz_id=quiz_id, student_id=student_id).first()
+        with self._lock:
+            draft = self._drafts.get(key)
+            answers = dict(draft.answers) if draft and not submitted else None
+        if answers is None:
+            # Submitted since the delta arrived; never leave a draft row behind
+            self.discard(quiz_id, student_id)
+            return
+        saved = write_session.get(self.model, key)
+        if saved is None:
+            saved = self.model(quiz_id=quiz_id, student_id=student_id)
+            write_session.add(saved)
+        saved.answers = answers
+        saved.updated_at = datetime.utcnow()
+
+    def _forget_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            for key in [key for key, draft in self._drafts.items() if now - draft.touched > self.idle_timeout]:
+                del self._drafts[key]
@@ -0,0 +1,124 @@
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+import click
+from flask import current_app, g, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, select
+
+REPLICA_BIND = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica engine when the current view allows it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and g and g.get('use_replica')
+                and not self._flushing and not isinstance(clause, (Insert, Update, Delete))):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Mark a view as safe to serve from the read replica"""
+    @wraps(view)
+    def decorated(*args, **kwargs):
+        replica = current_app.extensions['read_replica']
+        g.use_replica = replica.is_usable()
+        return view(*args, **kwargs)
+    return decorated
+
+
+class ReadReplica:
+    """Routes read-only views to a replica bind within a staleness tolerance.
+
+    The replica's lag is read from the replica_heartbeat row, which is
+    written on the primary and arrives on the replica through replication.
+    A client that has written recently stays on the primary until the
+    replica has caught up with that write.
+    """
+
+    def __init__(self, db, app=None):
+        self.db = db
+        self.enabled = False
+        self._heartbeat = None
+        self._heartbeat_checked = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['read_replica'] = self
+        self.enabled = REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {})
+        self.max_staleness = app.config['REPLICA_MAX_STALENESS_SECONDS']
+        self.check_interval = app.config['REPLICA_LAG_CHECK_SECONDS']
+
+        @app.after_request
+        def remember_write(response):
+            if self.enabled and request.method not in SAFE_METHODS:
+                session['last_write_at'] = time.time()
+            return response
+
+        @app.cli.group('replica')
+        def replica_cli():
+            """Read replica maintenance"""
+
+        @replica_cli.command('sync')
+        @click.option('--interval', type=float, default=0, help='Keep syncing every N seconds')
+        def sync_command(interval):
+            """Bump the heartbeat and, for SQLite, copy the primary to the replica"""
+            while True:
+                self.sync()
+                if not interval:
+                    break
+                time.sleep(interval)
+            click.echo('Replica synced')
+
+    def replica_heartbeat(self):
+        """Primary time (epoch seconds) the replica has caught up to, checked at most every few seconds"""
+        now = time.monotonic()
+        if now - self._heartbeat_checked >= self.check_interval:
+            from models import ReplicaHeartbeat
+            try:
+                with self.db.engines[REPLICA_BIND].connect() as connection:
+                    updated_at = connection.execute(select(ReplicaHeartbeat.updated_at)).scalar()
+            except Exception:
+                logging.warning('Read replica heartbeat unavailable', exc_info=True)
+                updated_at = None
+            self._heartbeat = updated_at.replace(tzinfo=timezone.utc).timestamp() if updated_at else None
+            self._heartbeat_checked = now
+        return self._heartbeat
+
+    def is_usable(self):
+        if not self.enabled:
+            return False
+        heartbeat = self.replica_heartbeat()
+        if heartbeat is None or time.time() - heartbeat > self.max_staleness:
+            return False
+        # Read-your-writes: the replica must already contain this client's last write
+        return heartbeat >= session.get('last_write_at', 0)
+
+    def sync(self):
+        """Stand-in replication step for local development with two SQLite files"""
+        from app import writer
+        from models import ReplicaHeartbeat
+
+        def beat(write_session):
+            write_session.merge(ReplicaHeartbeat(id=1, updated_at=datetime.utcnow()))
+
+        writer.write(beat)
+
+        primary = self.db.engines[None].url
+        replica = self.db.engines[REPLICA_BIND].url
+        if primary.get_backend_name() == 'sqlite' and replica.get_backend_name() == 'sqlite':
+            source = sqlite3.connect(primary.database)
+            target = sqlite3.connect(replica.database)
+            try:
+                source.backup(target)
+            finally:
+                source.close()
+                target.close()
+        self._heartbeat_checked = 0.0
@@ -1,18 +1,35 @@
 import os
 from datetime import datetime
-from flask import render_template, request, redirect, url_for, flash, jsonify, send_file
+import gzip
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify, send_file, make_response, Response
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
-from app import app, db
+from app import db, assets, writer, quiz_cache, quiz_drafts
+from replica import read_only
+from search import search_classroom
+from queries import STATUSES, assignment_page, submission_status
+from quiz_drafts import valid_answers
 from models import User, StaffID, ClassSession, Assignment, Submission, Quiz, QuizQuestion, QuizAttempt, Message, Notification
 
-@app.route('/')
+bp = Blueprint('main', __name__)
+
+@bp.route('/')
 def index():
     if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     return render_template('index.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/sw.js')
+def service_worker():
+    # Served from the root so the worker's scope covers the whole site
+    response = make_response(render_template('sw.js',
+                                             version=assets.version,
+                                             precache_urls=assets.precache_urls()))
+    response.mimetype = 'application/javascript'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form['username']
@@ -22,13 +39,13 @@ def login():
         
         if user and user.check_password(password):
             login_user(user)
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         else:
             flash('Invalid username or password', 'error')
     
     return render_template('login.html')
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         username = request.form['username']
@@ -51,35 +68,42 @@ def register():
         user.role = role
         user.set_password(password)
         
+        staff_id = None
         if role == 'teacher':
             staff_id = request.form['staff_id']
-            staff_record = StaffID.query.filter_by(staff_id=staff_id, is_used=False).first()
-            if not staff_record:
-                flash('Invalid or already used Staff ID', 'error')
-                return render_template('register.html')
-            
             user.staff_id = staff_id
-            staff_record.is_used = True
         else:  # student
             class_name = request.form['class_name']
             user.class_name = class_name
         
-        db.session.add(user)
-        db.session.commit()
+        def save_user(write_session):
+            # The staff ID is claimed on the write path so two sign-ups cannot both use it
+            if staff_id is not None:
+                staff_record = write_session.query(StaffID).filter_by(staff_id=staff_id, is_used=False).first()
+                if not staff_record:
+                    return False
+                staff_record.is_used = True
+            write_session.add(user)
+            return True
+        
+        if not writer.write(save_user):
+            flash('Invalid or already used Staff ID', 'error')
+            return render_template('register.html')
         
         flash('Registration successful! Please log in.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('register.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     logout_user()
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 @login_required
+@read_only
 def dashboard():
     if current_user.role == 'teacher':
         active_sessions = ClassSession.query.filter_by(teacher_id=current_user.id, is_active=True).all()
@@ -98,83 +122,146 @@ def dashboard():
                          quizzes=quizzes,
                          notifications=notifications)
 
-@app.route('/start_session', methods=['POST'])
+@bp.route('/start_session', methods=['POST'])
 @login_required
 def start_session():
     if current_user.role != 'teacher':
         flash('Only teachers can start sessions', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     class_name = request.form['class_name']
     subject = request.form['subject']
     
-    # End any existing active sessions for this class and subject
-    ClassSession.query.filter_by(class_name=class_name, subject=subject, is_active=True).update({'is_active': False, 'ended_at': datetime.utcnow()})
-    
     session = ClassSession()
     session.teacher_id = current_user.id
     session.class_name = class_name
     session.subject = subject
-    db.session.add(session)
-    db.session.commit()
     
     # Notify students
+    notifications = []
     students = User.query.filter_by(role='student', class_name=class_name).all()
     for student in students:
         notification = Notification()
         notification.user_id = student.id
         notification.title = f'New {subject} Session Started'
         notification.message = f'{current_user.username} has started a {subject} session for {class_name}'
-        db.session.add(notification)
+        notifications.append(notification)
     
-    db.session.commit()
+    def save_session(write_session):
+        # End any existing active sessions for this class and subject
+        write_session.query(ClassSession).filter_by(class_name=class_name, subject=subject, is_active=True).update({'is_active': False, 'ended_at': datetime.utcnow()})
+        write_session.add(session)
+        write_session.add_all(notifications)
+        write_session.flush()
+        return session.id
+    
+    session_id = writer.write(save_session)
     flash(f'Session started for {class_name} - {subject}', 'success')
-    return redirect(url_for('classroom', session_id=session.id))
+    return redirect(url_for('main.classroom', session_id=session_id))
 
-@app.route('/join_session/<int:session_id>')
+@bp.route('/join_session/<int:session_id>')
 @login_required
 def join_session(session_id):
     session = ClassSession.query.get_or_404(session_id)
     
     if current_user.role == 'student' and current_user.class_name != session.class_name:
         flash('You can only join sessions for your class', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if not session.is_active:
         flash('This session is no longer active', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
-    return redirect(url_for('classroom', session_id=session_id))
+    return redirect(url_for('main.classroom', session_id=session_id))
 
-@app.route('/classroom/<int:session_id>')
+@bp.route('/classroom/<int:session_id>')
 @login_required
 def classroom(session_id):
     session = ClassSession.query.get_or_404(session_id)
     
     if current_user.role == 'student' and current_user.class_name != session.class_name:
         flash('Access denied', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     messages = Message.query.filter_by(class_name=session.class_name, subject=session.subject).order_by(Message.timestamp.desc()).limit(50).all()
     
     return render_template('classroom.html', session=session, messages=messages)
 
-@app.route('/assignments')
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def assignment_filters():
+    return {
+        'page': max(request.args.get('page', 1, type=int), 1),
+        'per_page': min(max(request.args.get('per_page', 10, type=int), 1), 50),
+        'subject': request.args.get('subject') or None,
+        'due_after': request.args.get('due_after', type=parse_date),
+        'due_before': request.args.get('due_before', type=parse_date),
+        'class_name': request.args.get('class_name') or None,
+        'status': request.args.get('status') if request.args.get('status') in STATUSES else None,
+    }
+
+def filter_args(filters):
+    """The filters as given in the query string, for links to other pages"""
+    return {key: value for key, value in request.args.items() if key in filters and key != 'page' and value}
+
+@bp.route('/assignments')
 @login_required
+@read_only
 def assignments():
-    if current_user.role == 'teacher':
-        assignments = Assignment.query.filter_by(teacher_id=current_user.id).all()
-    else:
-        assignments = Assignment.query.filter_by(class_name=current_user.class_name).all()
-    
-    return render_template('assignments.html', assignments=assignments)
+    filters = assignment_filters()
+    now = datetime.utcnow()
+    pagination, status = assignment_page(current_user, now=now, **filters)
+    
+    return render_template('assignments.html',
+                         assignments=pagination.items,
+                         pagination=pagination,
+                         status=status,
+                         filters=filters,
+                         filter_args=filter_args(filters),
+                         now=now)
 
-@app.route('/create_assignment', methods=['POST'])
+@bp.route('/api/assignments')
+@login_required
+@read_only
+def get_assignments():
+    filters = assignment_filters()
+    now = datetime.utcnow()
+    pagination, status = assignment_page(current_user, now=now, **filters)
+    
+    results = []
+    for assignment in pagination.items:
+        item = {
+            'id': assignment.id,
+            'title': assignment.title,
+            'subject': assignment.subject,
+            'class_name': assignment.class_name,
+            'due_date': assignment.due_date.isoformat() if assignment.due_date else None,
+            'created_at': assignment.created_at.isoformat()
+        }
+        if current_user.role == 'teacher':
+            item['submissions'] = status[assignment.id]['submissions']
+            item['graded'] = status[assignment.id]['graded']
+        else:
+            submission = status.get(assignment.id)
+            item['status'] = submission_status(submission, assignment, now)
+            item['grade'] = submission.grade if submission else None
+        results.append(item)
+    
+    return jsonify({
+        'assignments': results,
+        'page': pagination.page,
+        'per_page': pagination.per_page,
+        'total': pagination.total,
+        'has_more': pagination.has_next
+    })
+
+@bp.route('/create_assignment', methods=['POST'])
 @login_required
 def create_assignment():
     if current_user.role != 'teacher':
         flash('Only teachers can create assignments', 'error')
-        return redirect(url_for('assignments'))
+        return redirect(url_for('main.assignments'))
     
     title = request.form['title']
     description = request.form['description']
@@ -189,28 +276,31 @@ def create_assignment():
     assignment.class_name = class_name
     assignment.teacher_id = current_user.id
     assignment.due_date = due_date
-    db.session.add(assignment)
-    db.session.commit()
     
     # Notify students
+    notifications = []
     students = User.query.filter_by(role='student', class_name=class_name).all()
     for student in students:
         notification = Notification()
         notification.user_id = student.id
         notification.title = f'New Assignment: {title}'
         notification.message = f'New assignment in {subject} for {class_name}'
-        db.session.add(notification)
+        notifications.append(notification)
+    
+    def save_assignment(write_session):
+        write_session.add(assignment)
+        write_session.add_all(notifications)
     
-    db.session.commit()
+    writer.write(save_assignment)
     flash('Assignment created successfully', 'success')
-    return redirect(url_for('assignments'))
+    return redirect(url_for('main.assignments'))
 
-@app.route('/submit_assignment/<int:assignment_id>', methods=['POST'])
+@bp.route('/submit_assignment/<int:assignment_id>', methods=['POST'])
 @login_required
 def submit_assignment(assignment_id):
     if current_user.role != 'student':
         flash('Only students can submit assignments', 'error')
-        return redirect(url_for('assignments'))
+        return redirect(url_for('main.assignments'))
     
     assignment = Assignment.query.get_or_404(assignment_id)
     content = request.form.get('content', '')
@@ -221,58 +311,65 @@ def submit_assignment(assignment_id):
         file = request.files['file']
         if file and file.filename:
             filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
             file.save(file_path)
     
-    # Check if submission already exists
-    existing_submission = Submission.query.filter_by(assignment_id=assignment_id, student_id=current_user.id).first()
+    student_id = current_user.id
     
-    if existing_submission:
-        existing_submission.content = content
-        existing_submission.file_path = file_path
-        existing_submission.submitted_at = datetime.utcnow()
-    else:
-        submission = Submission()
-        submission.assignment_id = assignment_id
-        submission.student_id = current_user.id
-        submission.content = content
-        submission.file_path = file_path
-        db.session.add(submission)
-    
-    db.session.commit()
+    def save_submission(write_session):
+        # Check if submission already exists
+        existing_submission = write_session.query(Submission).filter_by(assignment_id=assignment_id, student_id=student_id).first()
+        
+        if existing_submission:
+            existing_submission.content = content
+            existing_submission.file_path = file_path
+            existing_submission.submitted_at = datetime.utcnow()
+        else:
+            submission = Submission()
+            submission.assignment_id = assignment_id
+            submission.student_id = student_id
+            submission.content = content
+            submission.file_path = file_path
+            write_session.add(submission)
+    
+    writer.write(save_submission)
     flash('Assignment submitted successfully', 'success')
-    return redirect(url_for('assignments'))
+    return redirect(url_for('main.assignments'))
 
-@app.route('/grade_submission/<int:submission_id>', methods=['POST'])
+@bp.route('/grade_submission/<int:submission_id>', methods=['POST'])
 @login_required
 def grade_submission(submission_id):
     if current_user.role != 'teacher':
         flash('Only teachers can grade submissions', 'error')
-        return redirect(url_for('assignments'))
+        return redirect(url_for('main.assignments'))
     
     submission = Submission.query.get_or_404(submission_id)
     grade = int(request.form['grade'])
     feedback = request.form.get('feedback', '')
     
-    submission.grade = grade
-    submission.feedback = feedback
-    submission.graded_at = datetime.utcnow()
-    
-    db.session.commit()
+    graded_at = datetime.utcnow()
     
     # Notify student
     notification = Notification()
     notification.user_id = submission.student_id
     notification.title = 'Assignment Graded'
     notification.message = f'Your assignment "{submission.assignment.title}" has been graded: {grade}/100'
-    db.session.add(notification)
-    db.session.commit()
+    
+    def save_grade(write_session):
+        graded = write_session.get(Submission, submission_id)
+        graded.grade = grade
+        graded.feedback = feedback
+        graded.graded_at = graded_at
+        write_session.add(notification)
+    
+    writer.write(save_grade)
     
     flash('Submission graded successfully', 'success')
-    return redirect(url_for('assignments'))
+    return redirect(url_for('main.assignments'))
 
-@app.route('/quizzes')
+@bp.route('/quizzes')
 @login_required
+@read_only
 def quizzes():
     if current_user.role == 'teacher':
         quizzes = Quiz.query.filter_by(teacher_id=current_user.id).all()
@@ -281,12 +378,12 @@ def quizzes():
     
     return render_template('quiz.html', quizzes=quizzes)
 
-@app.route('/create_quiz', methods=['POST'])
+@bp.route('/create_quiz', methods=['POST'])
 @login_required
 def create_quiz():
     if current_user.role != 'teacher':
         flash('Only teachers can create quizzes', 'error')
-        return redirect(url_for('quizzes'))
+        return redirect(url_for('main.quizzes'))
     
     data = request.get_json()
     
@@ -297,12 +394,10 @@ def create_quiz():
     quiz.class_name = data['class_name']
     quiz.teacher_id = current_user.id
     quiz.time_limit = data['time_limit']
-    db.session.add(quiz)
-    db.session.flush()
     
+    questions = []
     for question_data in data['questions']:
         question = QuizQuestion()
-        question.quiz_id = quiz.id
         question.question_text = question_data['question']
         question.option_a = question_data['option_a']
         question.option_b = question_data['option_b']
@@ -310,41 +405,136 @@ def create_quiz():
         question.option_d = question_data['option_d']
         question.correct_answer = question_data['correct_answer']
         question.points = question_data['points']
-        db.session.add(question)
+        questions.append(question)
+    
+    def save_quiz(write_session):
+        write_session.add(quiz)
+        write_session.flush()
+        for question in questions:
+            question.quiz_id = quiz.id
+        write_session.add_all(questions)
     
-    db.session.commit()
+    writer.write(save_quiz)
     
     return jsonify({'success': True, 'message': 'Quiz created successfully'})
 
-@app.route('/take_quiz/<int:quiz_id>')
+@bp.route('/take_quiz/<int:quiz_id>')
 @login_required
 def take_quiz(quiz_id):
     if current_user.role != 'student':
         flash('Only students can take quizzes', 'error')
-        return redirect(url_for('quizzes'))
+        return redirect(url_for('main.quizzes'))
     
     quiz = Quiz.query.get_or_404(quiz_id)
     
     if not quiz.is_active:
         flash('This quiz is not active', 'error')
-        return redirect(url_for('quizzes'))
+        return redirect(url_for('main.quizzes'))
     
     # Check if student already took the quiz
     existing_attempt = QuizAttempt.query.filter_by(quiz_id=quiz_id, student_id=current_user.id).first()
     if existing_attempt:
         flash('You have already taken this quiz', 'info')
-        return redirect(url_for('quizzes'))
+        return redirect(url_for('main.quizzes'))
     
     return render_template('take_quiz.html', quiz=quiz)
 
-@app.route('/submit_quiz/<int:quiz_id>', methods=['POST'])
+@bp.route('/api/quiz/<int:quiz_id>/content')
+@login_required
+def quiz_content(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if current_user.role == 'teacher':
+        if quiz.teacher_id != current_user.id:
+            return jsonify({'error': 'Access denied'}), 403
+    elif quiz.class_name != current_user.class_name or not quiz.is_active:
+        return jsonify({'error': 'This quiz is not available'}), 403
+    
+    # Questions and options only; the answer key never leaves the server
+    cached = quiz_cache.get(quiz)
+    if quiz_cache.shuffle and current_user.role == 'student':
+        body, etag = cached.shuffled(current_user.id)
+        gzipped = None
+    else:
+        body, etag, gzipped = cached.body, cached.etag, cached.gzipped
+    
+    response = Response(body, mimetype='application/json')
+    if request.accept_encodings['gzip']:
+        response.set_data(gzipped or gzip.compress(body, mtime=0))
+        response.headers['Content-Encoding'] = 'gzip'
+        etag += '-gz'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@bp.route('/api/quiz/<int:quiz_id>/toggle', methods=['POST'])
+@login_required
+def toggle_quiz(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    if current_user.role != 'teacher' or quiz.teacher_id != current_user.id:
+        return jsonify({'error': 'Only the quiz owner can change its status'}), 403
+    
+    is_active = not quiz.is_active
+    
+    def save_status(write_session):
+        write_session.get(Quiz, quiz_id).is_active = is_active
+    
+    writer.write(save_status)
+    return jsonify({'success': True, 'is_active': is_active})
+
+def open_quiz_draft(quiz_id):
+    """Check the student may answer this quiz and load their draft, once per attempt"""
+    if quiz_drafts.is_open(quiz_id, current_user.id):
+        return True
+    quiz = db.session.get(Quiz, quiz_id)
+    if (quiz is None or current_user.role != 'student' or not quiz.is_active
+            or quiz.class_name != current_user.class_name):
+        return False
+    # A late delta after submission must not start a new draft
+    if QuizAttempt.query.filter_by(quiz_id=quiz_id, student_id=current_user.id).first():
+        return False
+    quiz_drafts.open(quiz_id, current_user.id, quiz_cache.get(quiz).question_ids)
+    return True
+
+@bp.route('/api/quiz/<int:quiz_id>/draft', methods=['GET', 'POST'])
+@login_required
+def quiz_draft(quiz_id):
+    if not open_quiz_draft(quiz_id):
+        return jsonify({'error': 'This quiz is not available'}), 403
+    
+    if request.method == 'POST':
+        deltas = request.get_json(silent=True) or {}
+        if not isinstance(deltas, dict):
+            return jsonify({'error': 'Answers must be an object of question id to answer'}), 400
+        saved = quiz_drafts.update(quiz_id, current_user.id, deltas)
+        return jsonify({'success': True, 'saved': saved})
+    
+    return jsonify({'answers': quiz_drafts.answers(quiz_id, current_user.id)})
+
+@bp.route('/submit_quiz/<int:quiz_id>', methods=['POST'])
 @login_required
 def submit_quiz(quiz_id):
     if current_user.role != 'student':
         return jsonify({'error': 'Only students can submit quizzes'}), 403
     
     quiz = Quiz.query.get_or_404(quiz_id)
-    answers = request.get_json()
+    student_id = current_user.id
+    
+    submitted = request.get_json(silent=True) or {}
+    if not isinstance(submitted, dict):
+        return jsonify({'error': 'Answers must be an object of question id to answer'}), 400
+    
+    # A retried or doubled submit returns the recorded result instead of grading again
+    existing_attempt = QuizAttempt.query.filter_by(quiz_id=quiz_id, student_id=student_id).first()
+    if existing_attempt:
+        quiz_drafts.discard(quiz_id, student_id)
+        return jsonify({'success': True, 'score': existing_attempt.score, 'total': existing_attempt.total_points})
+    
+    # Acknowledged answers are already saved in the draft; the request only
+    # carries the ones still in flight
+    answers = quiz_drafts.finalize(quiz_id, student_id)
+    answers.update(valid_answers(submitted, {str(question.id) for question in quiz.questions}))
     
     # Calculate score
     score = 0
@@ -361,17 +551,28 @@ def submit_quiz(quiz_id):
     attempt.score = score
     attempt.total_points = total_points
     attempt.completed_at = datetime.utcnow()
-    db.session.add(attempt)
-    db.session.commit()
+    
+    def save_attempt(write_session):
+        # Checked again on the write path so two racing submits record one attempt
+        recorded = write_session.query(QuizAttempt).filter_by(quiz_id=quiz_id, student_id=student_id).first()
+        if recorded is None:
+            write_session.add(attempt)
+            recorded = attempt
+        quiz_drafts.delete_persisted(write_session, quiz_id, student_id)
+        quiz_drafts.discard(quiz_id, student_id)
+        return recorded.score, recorded.total_points
+    
+    score, total_points = writer.write(save_attempt)
     
     return jsonify({'success': True, 'score': score, 'total': total_points})
 
-@app.route('/analytics')
+@bp.route('/analytics')
 @login_required
+@read_only
 def analytics():
     if current_user.role != 'teacher':
         flash('Only teachers can view analytics', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Get real analytics data
     total_assignments = Assignment.query.filter_by(teacher_id=current_user.id).count()
@@ -528,18 +729,18 @@ def analytics():
                          grading_completion=grading_completion,
                          quiz_participation=quiz_participation)
 
-@app.route('/video_call/<int:session_id>')
+@bp.route('/video_call/<int:session_id>')
 @login_required
 def video_call(session_id):
     session = ClassSession.query.get_or_404(session_id)
     
     if current_user.role == 'student' and current_user.class_name != session.class_name:
         flash('Access denied', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     return render_template('video_call.html', session=session)
 
-@app.route('/api/notifications')
+@bp.route('/api/notifications')
 @login_required
 def get_notifications():
     notifications = Notification.query.filter_by(user_id=current_user.id, is_read=False).all()
@@ -550,11 +751,38 @@ def get_notifications():
         'created_at': n.created_at.isoformat()
     } for n in notifications])
 
-@app.route('/api/mark_notification_read/<int:notification_id>', methods=['POST'])
+@bp.route('/api/search')
+@login_required
+@read_only
+def search():
+    terms = request.args.get('q', '').strip()
+    subject = request.args.get('subject') or None
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 50)
+    
+    # Students only search their own class; teachers pick the class
+    if current_user.role == 'teacher':
+        class_name = request.args.get('class_name')
+        if not class_name:
+            return jsonify({'error': 'class_name is required'}), 400
+    else:
+        class_name = current_user.class_name
+    
+    results, has_more = search_classroom(db, terms, class_name, subject, page, per_page)
+    return jsonify({
+        'results': results,
+        'page': page,
+        'per_page': per_page,
+        'has_more': has_more
+    })
+
+@bp.route('/api/mark_notification_read/<int:notification_id>', methods=['POST'])
 @login_required
 def mark_notification_read(notification_id):
     notification = Notification.query.get_or_404(notification_id)
     if notification.user_id == current_user.id:
-        notification.is_read = True
-        db.session.commit()
+        def mark_read(write_session):
+            write_session.get(Notification, notification_id).is_read = True
+        
+        writer.write(mark_read)
     return jsonify({'success': True})
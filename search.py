@@ -0,0 +1,164 @@
+import re
+from sqlalchemy import DateTime, text
+
+# Both backends keep the index in sync inside the database itself: SQLite
+# through triggers on external-content FTS5 tables, Postgres through
+# generated tsvector columns. Rows written by any code path are indexed.
+SQLITE_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+        content, class_name UNINDEXED, subject UNINDEXED,
+        content='message', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS message_fts_insert AFTER INSERT ON message BEGIN
+        INSERT INTO message_fts(rowid, content, class_name, subject)
+        VALUES (new.id, new.content, new.class_name, new.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS message_fts_delete AFTER DELETE ON message BEGIN
+        INSERT INTO message_fts(message_fts, rowid, content, class_name, subject)
+        VALUES ('delete', old.id, old.content, old.class_name, old.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS message_fts_update AFTER UPDATE ON message BEGIN
+        INSERT INTO message_fts(message_fts, rowid, content, class_name, subject)
+        VALUES ('delete', old.id, old.content, old.class_name, old.subject);
+        INSERT INTO message_fts(rowid, content, class_name, subject)
+        VALUES (new.id, new.content, new.class_name, new.subject);
+    END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS assignment_fts USING fts5(
+        title, description, class_name UNINDEXED, subject UNINDEXED,
+        content='assignment', content_rowid='id', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS assignment_fts_insert AFTER INSERT ON assignment BEGIN
+        INSERT INTO assignment_fts(rowid, title, description, class_name, subject)
+        VALUES (new.id, new.title, new.description, new.class_name, new.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assignment_fts_delete AFTER DELETE ON assignment BEGIN
+        INSERT INTO assignment_fts(assignment_fts, rowid, title, description, class_name, subject)
+        VALUES ('delete', old.id, old.title, old.description, old.class_name, old.subject);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS assignment_fts_update AFTER UPDATE ON assignment BEGIN
+        INSERT INTO assignment_fts(assignment_fts, rowid, title, description, class_name, subject)
+        VALUES ('delete', old.id, old.title, old.description, old.class_name, old.subject);
+        INSERT INTO assignment_fts(rowid, title, description, class_name, subject)
+        VALUES (new.id, new.title, new.description, new.class_name, new.subject);
+    END""",
+]
+
+POSTGRES_SCHEMA = [
+    """ALTER TABLE message ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_message_search_vector ON message USING GIN (search_vector)",
+    """ALTER TABLE assignment ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_assignment_search_vector ON assignment USING GIN (search_vector)",
+]
+
+# Lower bm25 is better; title matches count ten times as much as description.
+# snippet() needs a MATCH cursor, so building it for the page only would mean
+# scanning the match a second time; with 20k long matching messages that
+# scan costs about twice what snippets for every match do, so SQLite ranks
+# and builds snippets in one pass.
+SQLITE_SEARCH = """
+    SELECT 'message' AS kind, message.id AS id, message.subject AS subject, '' AS title,
+           snippet(message_fts, 0, '', '', '...', 16) AS snippet,
+           message.timestamp AS created_at, bm25(message_fts) AS rank
+    FROM message_fts JOIN message ON message.id = message_fts.rowid
+    WHERE message_fts MATCH :query AND message.class_name = :class_name
+      AND (:subject IS NULL OR message.subject = :subject)
+    UNION ALL
+    SELECT 'assignment', assignment.id, assignment.subject, assignment.title,
+           snippet(assignment_fts, 1, '', '', '...', 16),
+           assignment.created_at, bm25(assignment_fts, 10.0, 1.0)
+    FROM assignment_fts JOIN assignment ON assignment.id = assignment_fts.rowid
+    WHERE assignment_fts MATCH :query AND assignment.class_name = :class_name
+      AND (:subject IS NULL OR assignment.subject = :subject)
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+"""
+
+# Postgres ranks and paginates ids first and only runs ts_headline, the
+# expensive part, for the rows on that page.
+POSTGRES_SEARCH = """
+    WITH page AS (
+        SELECT 'message' AS kind, message.id AS id,
+               -ts_rank(message.search_vector, to_tsquery('english', :query)) AS rank
+        FROM message
+        WHERE message.search_vector @@ to_tsquery('english', :query)
+          AND message.class_name = :class_name
+          AND (CAST(:subject AS TEXT) IS NULL OR message.subject = :subject)
+        UNION ALL
+        SELECT 'assignment', assignment.id,
+               -ts_rank(assignment.search_vector, to_tsquery('english', :query))
+        FROM assignment
+        WHERE assignment.search_vector @@ to_tsquery('english', :query)
+          AND assignment.class_name = :class_name
+          AND (CAST(:subject AS TEXT) IS NULL OR assignment.subject = :subject)
+        ORDER BY rank, kind, id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT page.kind AS kind, message.id AS id, message.subject AS subject, '' AS title,
+           ts_headline('english', message.content, to_tsquery('english', :query),
+                       'StartSel=, StopSel=, MaxWords=16, MinWords=8') AS snippet,
+           message.timestamp AS created_at, page.rank AS rank
+    FROM page JOIN message ON message.id = page.id
+    WHERE page.kind = 'message'
+    UNION ALL
+    SELECT page.kind, assignment.id, assignment.subject, assignment.title,
+           ts_headline('english', coalesce(assignment.description, ''), to_tsquery('english', :query),
+                       'StartSel=, StopSel=, MaxWords=16, MinWords=8'),
+           assignment.created_at, page.rank
+    FROM page JOIN assignment ON assignment.id = page.id
+    WHERE page.kind = 'assignment'
+    ORDER BY rank, kind, id
+"""
+
+def create_search_index(db):
+    """Create the full-text index for the current backend and index existing rows"""
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        if dialect == 'sqlite':
+            existing = connection.execute(text(
+                "SELECT count(*) FROM sqlite_master WHERE name IN ('message_fts', 'assignment_fts')")).scalar()
+            for statement in SQLITE_SCHEMA:
+                connection.execute(text(statement))
+            if existing < 2:
+                connection.execute(text("INSERT INTO message_fts(message_fts) VALUES ('rebuild')"))
+                connection.execute(text("INSERT INTO assignment_fts(assignment_fts) VALUES ('rebuild')"))
+        elif dialect == 'postgresql':
+            for statement in POSTGRES_SCHEMA:
+                connection.execute(text(statement))
+
+def build_query(dialect, terms):
+    """Turn free text into a safe match expression; the last word matches as a prefix"""
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return None
+    if dialect == 'postgresql':
+        return ' & '.join(words[:-1] + [words[-1] + ':*'])
+    return ' '.join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+def search_classroom(db, terms, class_name, subject=None, page=1, per_page=20):
+    """Ranked messages and assignments for one class, returns (results, has_more)"""
+    dialect = db.session.get_bind().dialect.name
+    query = build_query(dialect, terms)
+    if query is None:
+        return [], False
+
+    sql = POSTGRES_SEARCH if dialect == 'postgresql' else SQLITE_SEARCH
+    # Typed so SQLite's stored strings come back as datetimes, like on Postgres
+    rows = db.session.execute(text(sql).columns(created_at=DateTime), {
+        'query': query,
+        'class_name': class_name,
+        'subject': subject,
+        'limit': per_page + 1,
+        'offset': (page - 1) * per_page,
+    }).mappings().all()
+
+    results = [{
+        'type': row['kind'],
+        'id': row['id'],
+        'subject': row['subject'],
+        'title': row['title'],
+        'snippet': row['snippet'],
+        'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+    } for row in rows[:per_page]]
+    return results, len(rows) > per_page
@@ -1,7 +1,9 @@
-from flask_socketio import emit, join_room, leave_room
+from datetime import datetime
+from flask import request
+from flask_socketio import emit, join_room, leave_room, rooms
 from flask_login import current_user
-from app import socketio, db
-from models import Message, ClassSession
+from app import socketio, writer, quiz_drafts, broadcaster
+from models import Message, ClassSession, User
 
 @socketio.on('join_classroom')
 def on_join(data):
@@ -12,6 +14,8 @@ def on_join(data):
         if session and (current_user.role == 'teacher' or current_user.class_name == session.class_name):
             room = f"classroom_{session_id}"
             join_room(room)
+            if broadcaster.enabled:
+                emit('roster', broadcaster.roster(room))
             emit('status', {
                 'msg': f'{current_user.username} has joined the classroom',
                 'user': current_user.username
@@ -23,11 +27,21 @@ def on_leave(data):
         session_id = data['session_id']
         room = f"classroom_{session_id}"
         leave_room(room)
+        if broadcaster.enabled:
+            broadcaster.forget_if_empty(room)
         emit('status', {
             'msg': f'{current_user.username} has left the classroom',
             'user': current_user.username
         }, to=room)
 
+@socketio.on('disconnect')
+def on_disconnect(*args):
+    # Still in its rooms here; they are left once the handler returns
+    if broadcaster.enabled:
+        for room in rooms():
+            if room.startswith('classroom_'):
+                broadcaster.forget_if_empty(room, request.sid)
+
 @socketio.on('send_message')
 def handle_message(data):
     if current_user.is_authenticated:
@@ -41,16 +55,41 @@ def handle_message(data):
             message.class_name = session.class_name
             message.subject = session.subject
             message.content = message_text
-            db.session.add(message)
-            db.session.commit()
+            message.timestamp = datetime.utcnow()
+            writer.write(lambda write_session: write_session.add(message))
             
             room = f"classroom_{session_id}"
-            emit('message', {
-                'username': current_user.username,
-                'message': message_text,
-                'timestamp': message.timestamp.strftime('%H:%M'),
-                'role': current_user.role
-            }, to=room)
+            if broadcaster.enabled:
+                broadcaster.send_message(room, current_user, message_text, message.timestamp)
+            else:
+                emit('message', {
+                    'username': current_user.username,
+                    'message': message_text,
+                    'timestamp': message.timestamp.strftime('%H:%M'),
+                    'role': current_user.role
+                }, to=room)
+
+@socketio.on('roster_lookup')
+def handle_roster_lookup(data):
+    # Names for user ids a client saw in a frame but not in its roster
+    if current_user.is_authenticated:
+        ids = data.get('ids') if isinstance(data, dict) else None
+        user_ids = [int(user_id) for user_id in (ids if isinstance(ids, list) else [])[:100]
+                    if isinstance(user_id, int) or (isinstance(user_id, str) and user_id.isdigit())]
+        users = User.query.filter(User.id.in_(user_ids)).all()
+        return {user.id: [user.username, user.role] for user in users}
+
+@socketio.on('quiz_answer')
+def handle_quiz_answer(data):
+    # Delta autosave: {'quiz_id': 1, 'answers': {'<question id>': 'A'}}, acknowledged to the client
+    if current_user.is_authenticated:
+        from routes import open_quiz_draft
+        quiz_id = data['quiz_id']
+        answers = data.get('answers') or {}
+        if not isinstance(answers, dict) or not open_quiz_draft(quiz_id):
+            return {'success': False}
+        saved = quiz_drafts.update(quiz_id, current_user.id, answers)
+        return {'success': True, 'saved': saved}
 
 @socketio.on('webrtc_offer')
 def handle_webrtc_offer(data):
@@ -0,0 +1,139 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.orm import Session
+
+
+def apply_sqlite_pragmas(engine, busy_timeout_ms, synchronous):
+    """Use WAL so readers never block the writer, and wait on locks instead of failing"""
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cursor.execute(f'PRAGMA synchronous={synchronous}')
+        cursor.close()
+
+
+class SQLiteWriter:
+    """Serializes database writes through one connection and group-commits them.
+
+    Producers hand a function taking a session to write(); it runs on the
+    writer thread inside its own savepoint, and every job collected within
+    the batch window is committed in a single transaction. When the mode is
+    disabled write() runs the function on db.session and commits directly,
+    so callers do not need to care which mode is active. Every request and
+    socket handler writes through here; only `flask init-db` commits on
+    db.session directly, before any worker is serving.
+    """
+
+    def __init__(self, db, app=None):
+        self.db = db
+        self.enabled = False
+        self.engine = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['sqlite_writer'] = self
+        url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.get_backend_name() != 'sqlite' or not app.config['SQLITE_OPTIMIZED']:
+            return
+        # A second engine on an in-memory database would open a separate,
+        # empty database, so writes stay on db.session there
+        if url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory':
+            return
+
+        self.enabled = True
+        self.batch_size = app.config['SQLITE_WRITER_BATCH_SIZE']
+        self.batch_window = app.config['SQLITE_WRITER_BATCH_WINDOW_MS'] / 1000
+        busy_timeout_ms = app.config['SQLITE_BUSY_TIMEOUT_MS']
+        synchronous = app.config['SQLITE_SYNCHRONOUS']
+
+        with app.app_context():
+            # Readers keep Flask-SQLAlchemy's own pool
+            reader_engine = self.db.engine
+            apply_sqlite_pragmas(reader_engine, busy_timeout_ms, synchronous)
+
+        self.engine = create_engine(reader_engine.url, pool_size=1, max_overflow=0,
+                                    connect_args={'check_same_thread': False})
+        apply_sqlite_pragmas(self.engine, busy_timeout_ms, synchronous)
+
+        # Let SQLAlchemy manage transactions so savepoints work, and take the
+        # write lock up front rather than upgrading mid-transaction
+        @event.listens_for(self.engine, 'connect')
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(self.engine, 'begin')
+        def begin_immediate(connection):
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+    def write(self, fn):
+        """Run fn(session) as a write and return its result once committed"""
+        if not self.enabled:
+            result = fn(self.db.session)
+            self.db.session.commit()
+            return result
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, future))
+        return future.result()
+
+    def _ensure_started(self):
+        # Started lazily so each forked worker gets its own writer
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch):
+        results = []
+        with Session(self.engine, expire_on_commit=False) as session:
+            try:
+                with session.begin():
+                    for fn, future in batch:
+                        try:
+                            with session.begin_nested():
+                                results.append((future, fn(session), None))
+                        except Exception as exc:
+                            results.append((future, None, exc))
+            except Exception as exc:
+                logging.exception('SQLite writer failed to commit a batch of %d writes', len(batch))
+                for _, future in batch:
+                    future.set_exception(exc)
+                return
+
+        for future, result, exc in results:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
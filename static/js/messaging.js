@@ -2,6 +2,8 @@ class Messaging {
     constructor(sessionId) {
         this.sessionId = sessionId;
         this.socket = io();
+        this.roster = {};
+        this.frameQueue = Promise.resolve();
         this.messageContainer = document.getElementById('messages');
         this.messageInput = document.getElementById('messageInput');
         this.sendButton = document.getElementById('sendMessage');
@@ -28,6 +30,16 @@ class Messaging {
             this.addMessage(data);
         });
         
+        // Compact mode: the roster maps user ids to [username, role]
+        this.socket.on('roster', (roster) => {
+            Object.assign(this.roster, roster);
+        });
+        
+        // Frames are rendered in order even when one waits on a roster lookup
+        this.socket.on('messages', (frame) => {
+            this.frameQueue = this.frameQueue.then(() => this.addMessageFrame(frame));
+        });
+        
         this.socket.on('status', (data) => {
             this.addStatusMessage(data.msg);
         });
@@ -100,6 +112,30 @@ class Messaging {
         }
     }
     
+    async addMessageFrame(frame) {
+        Object.assign(this.roster, frame.r || {});
+        
+        const unknown = [...new Set(frame.m.map(line => line[0]).filter(id => !this.roster[id]))];
+        if (unknown.length > 0) {
+            const found = await new Promise(resolve => {
+                this.socket.emit('roster_lookup', { ids: unknown }, resolve);
+            });
+            Object.assign(this.roster, found || {});
+        }
+        
+        frame.m.forEach(([userId, text, sentAt]) => {
+            const [username, role] = this.roster[userId] || ['Unknown', 'student'];
+            // Same UTC clock as the rendered history and per-line messages
+            const time = new Date(sentAt * 1000);
+            this.addMessage({
+                username: username,
+                role: role,
+                message: text,
+                timestamp: `${String(time.getUTCHours()).padStart(2, '0')}:${String(time.getUTCMinutes()).padStart(2, '0')}`
+            });
+        });
+    }
+    
     addStatusMessage(message) {
         const statusDiv = document.createElement('div');
         statusDiv.className = 'status-message text-center text-muted my-2';
@@ -4,6 +4,9 @@ class QuizSystem {
         this.timeRemaining = 0;
         this.timerInterval = null;
         this.answers = {};
+        this.pendingAnswers = {};
+        this.deltaTimer = null;
+        this.socket = null;
         this.autoSaveInterval = null;
         
         this.initialize();
@@ -59,6 +62,7 @@ class QuizSystem {
                 const questionId = e.target.name.replace('question_', '');
                 this.answers[questionId] = e.target.value;
                 this.saveAnswersLocally();
+                this.queueDelta(questionId, e.target.value);
             }
         });
     }
@@ -246,8 +250,13 @@ class QuizSystem {
         this.currentQuiz = quizData;
         this.timeRemaining = quizData.time_limit * 60; // Convert to seconds
         
-        // Load saved answers if any
+        // Load saved answers if any, then the server draft from any device
         this.loadAnswersLocally();
+        this.loadServerDraft();
+        
+        if (typeof io !== 'undefined') {
+            this.socket = io();
+        }
         
         // Start timer
         this.startTimer();
@@ -294,7 +303,8 @@ class QuizSystem {
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(this.answers)
+                // Acknowledged answers are already saved in the server draft
+                body: JSON.stringify(this.pendingAnswers)
             });
             
             const result = await response.json();
@@ -374,6 +384,73 @@ class QuizSystem {
         container?.insertAdjacentHTML('afterbegin', instructions);
     }
     
+    queueDelta(questionId, answer) {
+        if (!this.currentQuiz) return;
+        
+        this.pendingAnswers[questionId] = answer;
+        
+        // Debounce so quick changes go out as one small update
+        clearTimeout(this.deltaTimer);
+        this.deltaTimer = setTimeout(() => this.sendDeltas(), 1000);
+    }
+    
+    sendDeltas() {
+        const deltas = { ...this.pendingAnswers };
+        if (Object.keys(deltas).length === 0) return;
+        
+        const acknowledge = (result) => {
+            if (!result || !result.success) return;
+            // Drop only what the server confirmed and has not changed since
+            Object.keys(deltas).forEach(questionId => {
+                if (this.pendingAnswers[questionId] === deltas[questionId]) {
+                    delete this.pendingAnswers[questionId];
+                }
+            });
+        };
+        
+        if (this.socket && this.socket.connected) {
+            this.socket.emit('quiz_answer', { quiz_id: this.currentQuiz.id, answers: deltas }, acknowledge);
+        } else {
+            fetch(`/api/quiz/${this.currentQuiz.id}/draft`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(deltas)
+            })
+            .then(response => response.json())
+            .then(acknowledge)
+            .catch(error => console.error('Error saving answers:', error));
+        }
+    }
+    
+    async loadServerDraft() {
+        try {
+            const response = await fetch(`/api/quiz/${this.currentQuiz.id}/draft`);
+            if (!response.ok) return;
+            const draft = await response.json();
+            
+            Object.entries(draft.answers).forEach(([questionId, answer]) => {
+                // Answers changed on this page since loading still win
+                if (this.pendingAnswers[questionId] !== undefined) return;
+                this.answers[questionId] = answer;
+                const radio = document.querySelector(`input[name="question_${questionId}"][value="${answer}"]`);
+                if (radio) {
+                    radio.checked = true;
+                }
+            });
+            
+            // Local answers the server has not seen yet, e.g. saved while offline
+            Object.entries(this.answers).forEach(([questionId, answer]) => {
+                if (draft.answers[questionId] !== answer) {
+                    this.queueDelta(questionId, answer);
+                }
+            });
+        } catch (error) {
+            console.error('Error loading saved answers:', error);
+        }
+    }
+    
     saveAnswersLocally() {
         if (this.currentQuiz) {
             localStorage.setItem(`quiz_${this.currentQuiz.id}_answers`, JSON.stringify(this.answers));
@@ -1,79 +0,0 @@
-const CACHE_NAME = 'e-classroom-v1';
-const urlsToCache = [
-  '/',
-  '/static/css/style.css',
-  '/static/js/main.js',
-  '/static/js/video.js',
-  '/static/js/messaging.js',
-  '/static/js/quiz.js',
-  'https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css',
-  'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
-  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
-];
-
-self.addEventListener('install', function(event) {
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(function(cache) {
-        console.log('Opened cache');
-        return cache.addAll(urlsToCache);
-      })
-  );
-});
-
-self.addEventListener('fetch', function(event) {
-  event.respondWith(
-    caches.match(event.request)
-      .then(function(response) {
-        if (response) {
-          return response;
-        }
-        return fetch(event.request);
-      }
-    )
-  );
-});
-
-self.addEventListener('activate', function(event) {
-  event.waitUntil(
-    caches.keys().then(function(cacheNames) {
-      return Promise.all(
-        cacheNames.map(function(cacheName) {
-          if (cacheName !== CACHE_NAME) {
-            return caches.delete(cacheName);
-          }
-        })
-      );
-    })
-  );
-});
-
-// Push notification handling
-self.addEventListener('push', function(event) {
-  if (event.data) {
-    const notificationData = event.data.json();
-    const options = {
-      body: notificationData.body,
-      icon: 'https://cdn.jsdelivr.net/npm/@tabler/icons@latest/icons/school.svg',
-      badge: 'https://cdn.jsdelivr.net/npm/@tabler/icons@latest/icons/bell.svg',
-      vibrate: [200, 100, 200],
-      data: {
-        url: notificationData.url
-      }
-    };
-
-    event.waitUntil(
-      self.registration.showNotification(notificationData.title, options)
-    );
-  }
-});
-
-self.addEventListener('notificationclick', function(event) {
-  event.notification.close();
-  
-  if (event.notification.data && event.notification.data.url) {
-    event.waitUntil(
-      clients.openWindow(event.notification.data.url)
-    );
-  }
-});
@@ -0,0 +1,105 @@
+// Generated from the asset manifest, version {{ version }}
+const CACHE_NAME = 'e-classroom-assets';
+const ASSET_URLS = {{ precache_urls | tojson }};
+const EXTERNAL_URLS = [
+  'https://cdn.replit.com/agent/bootstrap-agent-dark-theme.min.css',
+  'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',
+  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
+];
+const PRECACHE_URLS = ASSET_URLS.concat(EXTERNAL_URLS);
+
+function isPrecached(url) {
+  const parsed = new URL(url, self.location.origin);
+  const key = parsed.origin === self.location.origin ? parsed.pathname : parsed.href;
+  return PRECACHE_URLS.indexOf(key) !== -1;
+}
+
+// Only fetch assets that are not cached yet; hashed names change with their content
+self.addEventListener('install', function(event) {
+  event.waitUntil(
+    caches.open(CACHE_NAME).then(function(cache) {
+      return Promise.all(
+        PRECACHE_URLS.map(function(url) {
+          return cache.match(url).then(function(response) {
+            if (!response) {
+              return cache.add(url);
+            }
+          });
+        })
+      );
+    }).then(function() {
+      return self.skipWaiting();
+    })
+  );
+});
+
+// Cache-first for precached assets, network for everything else (pages, API, sockets)
+self.addEventListener('fetch', function(event) {
+  if (event.request.method !== 'GET' || !isPrecached(event.request.url)) {
+    return;
+  }
+  event.respondWith(
+    caches.match(event.request).then(function(response) {
+      return response || fetch(event.request);
+    })
+  );
+});
+
+// Drop assets that are no longer in the manifest, and caches from older worker versions
+self.addEventListener('activate', function(event) {
+  event.waitUntil(
+    caches.keys().then(function(cacheNames) {
+      return Promise.all(
+        cacheNames.filter(function(cacheName) {
+          return cacheName !== CACHE_NAME;
+        }).map(function(cacheName) {
+          return caches.delete(cacheName);
+        })
+      );
+    }).then(function() {
+      return caches.open(CACHE_NAME);
+    }).then(function(cache) {
+      return cache.keys().then(function(requests) {
+        return Promise.all(
+          requests.filter(function(request) {
+            return !isPrecached(request.url);
+          }).map(function(request) {
+            return cache.delete(request);
+          })
+        );
+      });
+    }).then(function() {
+      return self.clients.claim();
+    })
+  );
+});
+
+// Push notification handling
+self.addEventListener('push', function(event) {
+  if (event.data) {
+    const notificationData = event.data.json();
+    const options = {
+      body: notificationData.body,
+      icon: 'https://cdn.jsdelivr.net/npm/@tabler/icons@latest/icons/school.svg',
+      badge: 'https://cdn.jsdelivr.net/npm/@tabler/icons@latest/icons/bell.svg',
+      vibrate: [200, 100, 200],
+      data: {
+        url: notificationData.url
+      }
+    };
+
+    event.waitUntil(
+      self.registration.showNotification(notificationData.title, options)
+    );
+  }
+});
+
+self.addEventListener('notificationclick', function(event) {
+  event.notification.close();
+  
+  if (event.notification.data && event.notification.data.url) {
+    event.waitUntil(
+      clients.openWindow(event.notification.data.url)
+    );
+  }
+});